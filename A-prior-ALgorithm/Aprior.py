@@ -1,51 +1,360 @@
-from itertools import combinations
+from itertools import combinations, chain
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np
+
+try:
+    from numba import njit, prange, set_num_threads
+except ImportError:  # numba is optional, we fall back on the numpy version below
+    njit = None
+
+
+def popcount(words):
+    """
+    Number of bits set in an array of uint64 words
+    (np.bitwise_count maps to the POPCNT instruction, older numpy versions unpack the bytes)
+    """
+    if hasattr(np, "bitwise_count"):
+        return int(np.bitwise_count(words).sum())
+    return int(np.unpackbits(words.view(np.uint8)).sum())
+
+
+if njit is not None:
+    # SWAR masks kept as uint64 so numba never goes through float arithmetic
+    _M1 = np.uint64(0x5555555555555555)
+    _M2 = np.uint64(0x3333333333333333)
+    _M4 = np.uint64(0x0F0F0F0F0F0F0F0F)
+    _H01 = np.uint64(0x0101010101010101)
+
+    @njit(cache=True)
+    def _popcount64(x):
+        x = x - ((x >> np.uint64(1)) & _M1)
+        x = (x & _M2) + ((x >> np.uint64(2)) & _M2)
+        x = (x + (x >> np.uint64(4))) & _M4
+        return (x * _H01) >> np.uint64(56)
+
+    @njit(cache=True)
+    def count_basket_pairs(cols, ptr, m):
+        """
+        Triangular pair counts : counts[a*(2m-a-1)//2 + b-a-1] (a < b) = number of baskets holding both
+        columns, the pairs of each basket are enumerated with two index loops over its sorted columns
+        """
+        counts = np.zeros(m * (m - 1) // 2, dtype=np.int64)
+        for t in range(ptr.shape[0] - 1):
+            for i in range(ptr[t], ptr[t + 1]):
+                a = cols[i]
+                row = a * (2 * m - a - 1) // 2 - a - 1
+                for j in range(i + 1, ptr[t + 1]):
+                    counts[row + cols[j]] += 1
+        return counts
+
+    @njit(parallel=True, cache=True)
+    def count_candidates(prefix_bitmaps, item_bitmaps, prefix_ids, last_cols, out):
+        """
+        out[i] = popcount(prefix_bitmaps[prefix_ids[i]] AND item_bitmaps[last_cols[i]]),
+        candidates are split across cores
+        """
+        n_words = item_bitmaps.shape[1]
+        for i in prange(prefix_ids.shape[0]):
+            total = 0
+            for w in range(n_words):
+                total += _popcount64(prefix_bitmaps[prefix_ids[i], w] & item_bitmaps[last_cols[i], w])
+            out[i] = total
+        return out
+else:
+    def count_candidates(prefix_bitmaps, item_bitmaps, prefix_ids, last_cols, out):
+        """
+        out[i] = popcount(prefix_bitmaps[prefix_ids[i]] AND item_bitmaps[last_cols[i]])
+        """
+        for i in range(len(prefix_ids)):
+            out[i] = popcount(prefix_bitmaps[prefix_ids[i]] & item_bitmaps[last_cols[i]])
+        return out
+
+
+def _count_shard(args):
+    """
+    Worker side of count_candidates_parallel : attach the shared bitmaps and count one shard
+    """
+    specs, prefix_ids, last_cols = args
+    if njit is not None:
+        # the processes already split the work: one numba thread each, not n_jobs full thread pools
+        set_num_threads(1)
+    shms = [shared_memory.SharedMemory(name=name) for name, _ in specs]
+    try:
+        prefix_bitmaps, item_bitmaps = [np.ndarray(shape, dtype=np.uint64, buffer=shm.buf)
+                                        for shm, (_, shape) in zip(shms, specs)]
+        counts = count_candidates(prefix_bitmaps, item_bitmaps, prefix_ids, last_cols,
+                                  np.empty(len(prefix_ids), dtype=np.int64))
+        del prefix_bitmaps, item_bitmaps  # release the views before closing the segments
+        return counts
+    finally:
+        for shm in shms:
+            shm.close()
+
+
+def count_candidates_parallel(prefix_bitmaps, item_bitmaps, prefix_ids, last_cols, n_jobs):
+    """
+    Same result as count_candidates but the candidates are sharded over n_jobs processes,
+    the bitmaps are copied once into shared memory instead of being pickled to every worker
+    """
+    shms = []
+    try:
+        specs = []
+        for arr in (prefix_bitmaps, item_bitmaps):
+            shm = shared_memory.SharedMemory(create=True, size=max(arr.nbytes, 1))
+            shms.append(shm)
+            np.ndarray(arr.shape, dtype=np.uint64, buffer=shm.buf)[...] = arr
+            specs.append((shm.name, arr.shape))
+
+        shards = np.array_split(np.arange(len(prefix_ids)), n_jobs)
+        with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+            parts = executor.map(_count_shard, [(specs, prefix_ids[shard], last_cols[shard]) for shard in shards])
+            return np.concatenate(list(parts))
+    finally:
+        for shm in shms:
+            shm.close()
+            shm.unlink()
+
+
+def read_transactions(path):
+    """
+    Parse a .dat file (one basket of item ids per line) straight into a flat CSR layout :
+    items holds the items of all baskets as int32 and basket t is items[ptr[t]:ptr[t+1]]
+    """
+    with open(path, "r") as f:
+        text = f.read()
+    sizes = [len(line.split()) for line in text.splitlines() if line.strip()]
+    # np.fromstring reads a whitespace-only text as a single 0, so a blank file gets no items at all
+    items = np.fromstring(text, dtype=np.int32, sep=" ") if sizes else np.empty(0, dtype=np.int32)
+    ptr = np.zeros(len(sizes) + 1, dtype=np.int64)
+    np.cumsum(sizes, out=ptr[1:])
+    # fromstring silently stops at the first token that is not an integer
+    if len(items) != ptr[-1]:
+        raise ValueError(f"{path}: non-integer item after the first {len(items)} items")
+    return items, ptr
+
+
+def to_csr(transactions):
+    """
+    Same CSR layout (items, ptr) built from a list of baskets
+    """
+    sizes = [len(basket) for basket in transactions]
+    items = np.fromiter(chain.from_iterable(transactions), dtype=np.int32, count=sum(sizes))
+    ptr = np.zeros(len(sizes) + 1, dtype=np.int64)
+    np.cumsum(sizes, out=ptr[1:])
+    return items, ptr
+
+
+class FrequentItemsets:
+    """
+    Frequent k-itemsets of one pass stored column-wise : itemsets is an (n, k) int32 array with one
+    sorted itemset per row and counts the (n,) int32 supports
+    it reads like the old {itemset: count} dict (len, iteration over itemsets, items())
+    """
+    __slots__ = ("itemsets", "counts")
+
+    def __init__(self, itemsets, counts):
+        self.itemsets = np.asarray(itemsets, dtype=np.int32)
+        self.counts = np.asarray(counts, dtype=np.int32)
+
+    def __len__(self):
+        return len(self.counts)
+
+    def keys(self):
+        return [tuple(row) for row in self.itemsets.tolist()]
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def items(self):
+        return zip(self.keys(), self.counts.tolist())
+
 
 class Apriori:
-    def __init__(self, transactions, support):
-        self.transactions = transactions
+    def __init__(self, transactions, support, n_jobs=1):
+        """
+        Args:
+            transactions: list of baskets, or the (items, ptr) arrays returned by read_transactions
+            support: minimum support threshold
+            n_jobs: number of processes used to count the candidates of passes k >= 3
+        """
+        if isinstance(transactions, tuple):
+            self.items, self.ptr = transactions
+        else:
+            self.items, self.ptr = to_csr(transactions)
         self.support = support
+        self.n_jobs = n_jobs
         self.L = {}
+        self.item_to_col = {}
+        self.col_to_item = None
+        self.col_dtype = np.int16
+        self.basket_cols = None
+        self.basket_ptr = None
+        self.T = None
+        self.bitmaps = None
+        # tidsets (as bitmaps) of the frequent itemsets of the previous pass
+        self.prev_index = {}
+        self.prev_bitmaps = None
     
     def pass1(self):
         """
         First pass: we  count all unique items and keep those with support >= threshold
         """
-        item_count = defaultdict(int)
-        for basket in self.transactions:
-            for item in basket:
-                item_count[item] += 1
+        unique_items, item_count = np.unique(self.items, return_counts=True)
+        keep = item_count >= self.support
         
-        frequent_items = [(item,) for item, count in item_count.items() if count >= self.support]
-        self.L[1] = {item: item_count[item[0]] for item in frequent_items} #we stock them for later to have all the frequent items in each pass 
+        frequent_items = [(item,) for item in unique_items[keep].tolist()]
+        self.L[1] = FrequentItemsets(unique_items[keep].reshape(-1, 1), item_count[keep]) #we stock them for later to have all the frequent items in each pass 
+        self.build_matrix(frequent_items)
         return frequent_items
+
+    def build_matrix(self, frequent_items):
+        """
+        Encode the transactions as a boolean matrix T of shape (num_transactions, num_frequent_items)
+        T[t, j] is True when basket t contains the j-th frequent item, infrequent items are dropped
+        """
+        self.item_to_col = {item[0]: col for col, item in enumerate(frequent_items)}
+        # frequent items are sorted so the column of an item is its position in col_to_item
+        self.col_to_item = np.array([item[0] for item in frequent_items], dtype=np.int32)
+        self.col_dtype = np.int16 if len(frequent_items) < 2**15 else np.int32
+        n = len(self.ptr) - 1
+        self.T = np.zeros((n, len(frequent_items)), dtype=bool)
+
+        if frequent_items:
+            cols = np.minimum(np.searchsorted(self.col_to_item, self.items), len(frequent_items) - 1)
+            rows = np.repeat(np.arange(n), np.diff(self.ptr))
+            found = self.col_to_item[cols] == self.items
+            self.T[rows[found], cols[found]] = True
+
+        # interned baskets : CSR of the dense column ids of their frequent items (sorted, no duplicates,
+        # nonzero walks T row by row)
+        rows, cols = np.nonzero(self.T)
+        self.basket_cols = cols.astype(self.col_dtype)
+        self.basket_ptr = np.searchsorted(rows, np.arange(n + 1))
+        self.build_bitmaps()
+        return self.T
+
+    def build_bitmaps(self):
+        """
+        Vertical view of T : bitmaps[j] packs the column of item j into uint64 words,
+        one bit per transaction, so a support is popcount(AND of the item bitmaps)
+        """
+        n = self.T.shape[0]
+        n_words = (n + 63) // 64
+        packed = np.zeros((self.T.shape[1], n_words * 8), dtype=np.uint8)
+        packed[:, :(n + 7) // 8] = np.packbits(self.T.T, axis=1, bitorder="little")
+        self.bitmaps = packed.view(np.uint64)
+        self.prev_index = {(item,): col for item, col in self.item_to_col.items()}
+        self.prev_bitmaps = self.bitmaps
+        return self.bitmaps
+
+    def count_pairs(self, block_size=8192):
+        """
+        Support of every pair of frequent items as a flat upper-triangular array of m*(m-1)/2 counts,
+        in the order of np.triu_indices(m, 1)
+        with numba the pairs of each basket (restricted to frequent items) are enumerated in a jitted loop,
+        baskets are short so this is far less work than a product over the whole matrix
+        otherwise one matrix product T.T @ T (done in float32 so numpy hands it to BLAS, counts stay
+        exact below 2**24 baskets) going through T by blocks of rows to avoid a full float copy of the matrix
+        """
+        m = self.T.shape[1]
+        if njit is not None:
+            return count_basket_pairs(self.basket_cols, self.basket_ptr, m)
+
+        pair_counts = np.zeros((m, m), dtype=np.float32)
+        for start in range(0, self.T.shape[0], block_size):
+            block = self.T[start:start + block_size].astype(np.float32)
+            pair_counts += block.T @ block
+        return pair_counts[np.triu_indices(m, 1)].astype(np.int64)
     
-    def generate_candidates(self, prev_frequent, k):
+    @staticmethod
+    def mix(items):
+        """
+        splitmix64 finalizer : spreads each item id over 64 bits (uint64 arithmetic wraps around)
+        """
+        x = items.astype(np.uint64) + np.uint64(0x9E3779B97F4A7C15)
+        x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        return x ^ (x >> np.uint64(31))
+
+    @staticmethod
+    def hash_itemsets(mixed):
+        """
+        Hash of each row = XOR of its mixed items, XOR being reversible the hash of the subset
+        without one item is just hash ^ mix(item), no subset has to be built
+        """
+        return np.bitwise_xor.reduce(mixed, axis=1)
+
+    def generate_candidates(self, prev, k):
         """
         Generate candidate k-itemsets from frequent (k-1)-itemsets
-        
+        prev holds the (k-1)-itemsets as rows of column ids, sorted lexicographically
+        the itemsets are grouped by their first k-2 items with np.unique, inside a group every
+        pair of last items gives a candidate, then all the (k-1)-subsets are checked at once with np.isin
+        Returns the candidates (rows of column ids) and for each one the row of its (k-1)-prefix in prev
         """
-        candidates = set()
-        prev_frequent_sorted = sorted([tuple(sorted(x)) for x in prev_frequent])
-        prev_frequent_set = set(prev_frequent_sorted)
-        
-        n = len(prev_frequent_sorted)
-        
-        for i in range(n):
-            for j in range(i + 1, n):
-                itemset1 = prev_frequent_sorted[i]
-                itemset2 = prev_frequent_sorted[j]
-                
-                # here we satistfy the condition where  first k-2 elements must be the same
-                if itemset1[:-1] == itemset2[:-1]:
-                    candidate = tuple(sorted(set(itemset1) | set(itemset2)))
-                    
-                    # Pruning: all (k-1)-subsets must be frequent
-                    if all(tuple(sorted(sub)) in prev_frequent_set for sub in combinations(candidate, k-1)):
-                        candidates.add(candidate)
-        
-        return list(candidates)
+
+        # here we satistfy the condition where  first k-2 elements must be the same
+        if k == 2:
+            prefix_id = np.zeros(len(prev), dtype=np.int64)
+        else:
+            prefix_id = np.unique(prev[:, :-1], axis=0, return_inverse=True)[1].ravel()
+        # rows are sorted so every prefix group is a contiguous run
+        groups = np.split(np.arange(len(prev)), np.flatnonzero(np.diff(prefix_id)) + 1)
+
+        blocks, prefixes = [], []
+        for idx in groups:
+            if len(idx) < 2:
+                continue
+            i, j = np.triu_indices(len(idx), 1)
+            block = np.empty((len(i), k), dtype=prev.dtype)
+            block[:, :-1] = prev[idx[i]]
+            block[:, -1] = prev[idx[j], -1]
+            blocks.append(block)
+            prefixes.append(idx[i])
+
+        if not blocks:
+            return np.empty((0, k), dtype=prev.dtype), np.empty(0, dtype=np.int64)
+        candidates = np.concatenate(blocks)
+        prefix_rows = np.concatenate(prefixes)
+
+        # Pruning: all (k-1)-subsets must be frequent, dropping one of the two last items gives back
+        # the joined itemsets so only the first k-2 positions need a check
+        # (a hash collision can only let an extra candidate through, its count then filters it out)
+        if k > 2:
+            prev_hashes = self.hash_itemsets(self.mix(prev))
+            mixed = self.mix(candidates)
+            cand_hashes = self.hash_itemsets(mixed)
+            keep = np.ones(len(candidates), dtype=bool)
+            for pos in range(k - 2):
+                keep &= np.isin(cand_hashes ^ mixed[:, pos], prev_hashes)
+            candidates, prefix_rows = candidates[keep], prefix_rows[keep]
+
+        return candidates, prefix_rows
     
+    def pass2(self):
+        """
+        Pass 2 with a triangular matrix : every pair of frequent items is a candidate so we skip
+        candidate generation, count all pairs at once and read L2 off the triangular array
+        """
+        m = len(self.item_to_col)
+        counts = self.count_pairs()
+        i, j = np.triu_indices(m, 1)
+        keep = np.flatnonzero(counts >= self.support)
+        i, j = i[keep], j[keep]
+
+        # columns follow the sorted frequent items so (item_i, item_j) is already sorted
+        itemsets = np.stack([self.col_to_item[i], self.col_to_item[j]], axis=1)
+        frequent_2_items = [tuple(itemset) for itemset in itemsets.tolist()]
+        self.L[2] = FrequentItemsets(itemsets, counts[keep])
+
+        # keep the tidsets of L2 for the next pass
+        self.prev_bitmaps = self.bitmaps[i] & self.bitmaps[j]
+        self.prev_index = {itemset: row for row, itemset in enumerate(frequent_2_items)}
+
+        return frequent_2_items
+
     def passk(self, prev_frequent, k):
         """
         Pass k of A-Priori algorithm we generalise the algorithme of pass 1 :
@@ -55,35 +364,41 @@ class Apriori:
         """
         if k < 2:
             raise ValueError("k must be >= 2")
+        if k == 2:
+            return self.pass2()
         
-        candidates = self.generate_candidates(prev_frequent, k)
+        # intern L(k-1) as rows of dense column ids, sorted so that prefix groups are contiguous
+        prev = np.array([[self.item_to_col[item] for item in itemset] for itemset in prev_frequent],
+                        dtype=self.col_dtype).reshape(-1, k - 1)
+        order = np.lexsort(prev.T[::-1])
+        prev = prev[order]
+        prev_rows = np.array([self.prev_index[tuple(prev_frequent[i])] for i in order.tolist()], dtype=np.int64)
+
+        candidates, prefix_rows = self.generate_candidates(prev, k)
         
-        if not candidates:
+        if len(candidates) == 0:
             return []
         
-        candidates_set = set(candidates)
-        k_count = defaultdict(int)
-        
-        # extract all frequent items from L(k-1)
-        frequent_items = set()
-        for itemset in prev_frequent:
-            frequent_items.update(itemset)
-        
-        # Count support of each candidate in baskets of transactions (data)
-        for basket in self.transactions:
-            basket_items = [item for item in basket if item in frequent_items]
-            
-            if len(basket_items) < k:
-                continue
-            
-            for subset in combinations(basket_items, k):
-                subset = tuple(sorted(subset))
-                if subset in candidates_set:
-                    k_count[subset] += 1
-        
+        # a candidate is its (k-1)-prefix, which is in L(k-1), plus one last item
+        # so its tidset is tidset(prefix) AND tidset(last item) : one AND per candidate, no basket scan
+        prefix_ids = prev_rows[prefix_rows]
+        last_cols = candidates[:, -1].astype(np.int64)
+
+        if self.n_jobs > 1 and len(candidates) >= self.n_jobs:
+            counts = count_candidates_parallel(self.prev_bitmaps, self.bitmaps, prefix_ids, last_cols, self.n_jobs)
+        else:
+            counts = count_candidates(self.prev_bitmaps, self.bitmaps, prefix_ids, last_cols,
+                                      np.empty(len(candidates), dtype=np.int64))
+
         #  finally wwe filter Ck -> Lk (keep only support >= threshold)
-        frequent_k_items = [itemset for itemset, count in k_count.items() if count >= self.support]
-        self.L[k] = {itemset: k_count[itemset] for itemset in frequent_k_items}
+        keep = np.flatnonzero(counts >= self.support)
+        itemsets = self.col_to_item[candidates[keep]]
+        frequent_k_items = [tuple(itemset) for itemset in itemsets.tolist()]
+        self.L[k] = FrequentItemsets(itemsets, counts[keep])
+
+        # keep the tidsets of Lk for the next pass
+        self.prev_bitmaps = self.prev_bitmaps[prefix_ids[keep]] & self.bitmaps[last_cols[keep]]
+        self.prev_index = {itemset: row for row, itemset in enumerate(frequent_k_items)}
         
         return frequent_k_items
     
@@ -117,42 +432,73 @@ class AssociationRulesGenerator:
     def __init__(self, frequent_itemsets, c):
         """
         Args:
-            frequent_itemsets: dictionary L from A-Priori {k: {itemset: count}}
+            frequent_itemsets: dictionary L from A-Priori {k: FrequentItemsets} (or {k: {itemset: count}})
             c: minimum confidence threshold
         """
         self.L = frequent_itemsets
         self.c = c
     
+    @staticmethod
+    def row_keys(itemsets):
+        """
+        One fixed-size binary key per row of an (n, k) itemset array, so whole itemsets
+        can be sorted and looked up with np.searchsorted
+        """
+        itemsets = np.ascontiguousarray(itemsets, dtype=np.int64)
+        return itemsets.view(np.dtype((np.void, 8 * itemsets.shape[1]))).ravel()
+
+    def tables(self):
+        """
+        Every pass of L as (itemsets, supports, sorted keys, order of the keys), itemset rows sorted
+        """
+        tables = {}
+        for k, frequent in self.L.items():
+            if isinstance(frequent, FrequentItemsets):
+                itemsets, counts = frequent.itemsets, frequent.counts
+            else:
+                itemsets = np.array([sorted(itemset) for itemset in frequent.keys()], dtype=np.int64).reshape(-1, k)
+                counts = np.array(list(frequent.values()), dtype=np.int64)
+            keys = self.row_keys(itemsets)
+            order = np.argsort(keys)
+            tables[k] = (itemsets, counts.astype(np.float64), keys[order], order)
+        return tables
+
     def generate_rules(self, verbose=False):
         """
         Generate all association rules with confidence >= c
-        
+        for each itemset size k and each choice of antecedent positions, the supports of all the
+        antecedents are found at once with np.searchsorted and the confidences are one array division
         """
-        # Combine all itemsets from all passes into a single dictionary
-        all_itemsets = {}
-        for k in self.L.keys():
-            for itemset, count in self.L[k].items():
-                all_itemsets[frozenset(itemset)] = count
-        
+        tables = self.tables()
+
         # Generate rules from itemsets with size >= 2
         association_rules = defaultdict(set)
-        for itemset in filter(lambda x: len(x) > 1, all_itemsets.keys()):
+        for k, (itemsets, supports, _, _) in tables.items():
+            if k < 2 or len(itemsets) == 0:
+                continue
             # For each possible antecedent size
-            for antecedent_length in range(1, len(itemset)):
-                # For each possible antecedent combination
-                for antecedent in [frozenset(comb) for comb in combinations(itemset, antecedent_length)]:
-                    if antecedent not in all_itemsets:
-                        continue
-                    
+            for antecedent_length in range(1, k):
+                if antecedent_length not in tables or len(tables[antecedent_length][2]) == 0:
+                    continue
+                _, sub_supports, sub_keys, sub_order = tables[antecedent_length]
+                # For each possible choice of antecedent positions
+                for cols in combinations(range(k), antecedent_length):
+                    antecedents = itemsets[:, cols]
+                    keys = self.row_keys(antecedents)
+                    pos = np.minimum(np.searchsorted(sub_keys, keys), len(sub_keys) - 1)
+                    found = sub_keys[pos] == keys
+
                     # Calculate confidence: conf(X => Y) = support(X ∪ Y) / support(X)
-                    confidence = all_itemsets[itemset] / all_itemsets[antecedent]
-                    
-                    if confidence >= self.c:
-                        consequent = itemset - antecedent
+                    confidence = supports / sub_supports[sub_order[pos]]
+                    rest = [col for col in range(k) if col not in cols]
+
+                    for row in np.flatnonzero(found & (confidence >= self.c)).tolist():
+                        antecedent = frozenset(antecedents[row].tolist())
+                        consequent = frozenset(itemsets[row, rest].tolist())
                         association_rules[antecedent].add(consequent)
-                        
+
                         if verbose:
-                            print(f"{set(antecedent)} => {set(consequent)} | conf={confidence:.4f}")
+                            print(f"{set(antecedent)} => {set(consequent)} | conf={confidence[row]:.4f}")
         
         return association_rules
 
@@ -163,14 +509,9 @@ if __name__ == "__main__":
     print("=" * 70)
     print("READING FILE")
     print("=" * 70)
-    transactions = []
-    with open("T10I4D100K.dat", "r") as f:
-        for line in f:
-            line = line.strip()
-            if line:
-                transactions.append(list(map(int, line.split())))
+    transactions = read_transactions("T10I4D100K.dat")
     
-    print(f"Number of transactions: {len(transactions)}\n")
+    print(f"Number of transactions: {len(transactions[1]) - 1}\n")
     
     # Execute A-Priori
     print("=" * 70)
@@ -1,21 +1,131 @@
 from collections import defaultdict
-from scipy.stats import bernoulli
 import random
-from typing import Set, FrozenSet, Callable, DefaultDict
-from functools import reduce
+from typing import Set, Dict, Tuple, Union, DefaultDict
+import numpy as np
 
+try:
+    from numba import njit
+except ImportError:  # numba is optional, the edge file is then parsed line by line
+    njit = None
 
-def parse_edge_line(text: str) -> FrozenSet[int]:
+# an undirected edge, always stored as (smaller vertex, larger vertex)
+Edge = Tuple[int, int]
+
+
+def parse_edge_line(text: bytes) -> Edge:
     #firstly we extract edge information from our data 
-    # Parse text, split by spaces, convert to integers, return as frozenset
-    vertices = [int(v) for v in text.split()]
-    return frozenset(vertices)
+    # Parse raw bytes (int() takes them directly, no decoding), split by spaces, return as an ordered pair
+    # only the first two columns are endpoints, anything after (weights, timestamps) is ignored
+    a, b = text.split()[:2]
+    u, v = int(a), int(b)
+    return (u, v) if u <= v else (v, u)
+
+
+if njit is not None:
+    @njit(cache=True)
+    def parse_edges(raw):
+        # raw: the whole edge file as a uint8 array. One pass over the bytes, two ints per line,
+        # '#' lines and lines without two numbers are skipped, extra columns ignored
+        n = raw.size
+        cap = 1
+        for c in raw:
+            if c == 10:
+                cap += 1
+        us = np.empty(cap, dtype=np.int64)
+        vs = np.empty(cap, dtype=np.int64)
+        k = 0
+        i = 0
+        while i < n:
+            if raw[i] == 35:  # '#': skip the whole line
+                while i < n and raw[i] != 10:
+                    i += 1
+                i += 1
+                continue
+            got = 0
+            a = 0
+            b = 0
+            while i < n and raw[i] != 10:
+                if 48 <= raw[i] <= 57:
+                    x = 0
+                    while i < n and 48 <= raw[i] <= 57:
+                        x = x * 10 + (raw[i] - 48)
+                        i += 1
+                    if got == 0:
+                        a = x
+                    elif got == 1:
+                        b = x
+                    got += 1
+                else:
+                    i += 1
+            i += 1
+            if got >= 2:
+                us[k] = a
+                vs[k] = b
+                k += 1
+        return us[:k], vs[:k]
+else:
+    def parse_edges(raw):
+        # same rules as the compiled parser, one parse_edge_line call per line
+        edges = [
+            parse_edge_line(line) for line in raw.tobytes().splitlines()
+            if not line.startswith(b'#') and len(line.split()) >= 2
+        ]
+        edges = np.array(edges, dtype=np.int64).reshape(-1, 2)
+        return edges[:, 0], edges[:, 1]
+
+
+def read_edges(filepath: str) -> Tuple[np.ndarray, np.ndarray]:
+    # slurp the file once and parse every edge up front, returned as (smaller, larger) endpoint arrays
+    with open(filepath, 'rb') as f:
+        raw = np.frombuffer(f.read(), dtype=np.uint8)
+    us, vs = parse_edges(raw)
+    return np.minimum(us, vs), np.maximum(us, vs)
+
+
+class SortedNeighbors:
+    """
+    Neighbours of one vertex as a sorted int32 array, a drop-in for the set used by default.
+    New neighbours wait in a small buffer and are merged in (one sort) on the next read,
+    intersections run in C via np.intersect1d instead of hashing python ints.
+    """
+    __slots__ = ("array", "pending")
+
+    def __init__(self):
+        self.array: np.ndarray = np.empty(0, dtype=np.int32)
+        self.pending: list = []
+
+    def _flush(self) -> np.ndarray:
+        if self.pending:
+            self.array = np.union1d(self.array, np.array(self.pending, dtype=np.int32))
+            self.pending = []
+        return self.array
+
+    def add(self, w: int) -> None:
+        self.pending.append(w)
+
+    def discard(self, w: int) -> None:
+        array = self._flush()
+        i = np.searchsorted(array, w)
+        if i < array.size and array[i] == w:
+            self.array = np.delete(array, i)
+
+    def intersection(self, other: "SortedNeighbors") -> np.ndarray:
+        return np.intersect1d(self._flush(), other._flush(), assume_unique=True)
+
+    def __len__(self) -> int:
+        return self._flush().size
+
+    def __iter__(self):
+        return iter(self._flush().tolist())
 
 
 class TriangleCounter:
    #the base implemantation of our algorithme 
    
-    def __init__(self, filepath: str, memory_size: int, print_logs: bool = True):
+    # dtype of the per-vertex counters (IMPR adds fractional eta(t) weights)
+    count_dtype = np.int64
+
+    def __init__(self, filepath: str, memory_size: int, print_logs: bool = True, sorted_adjacency: bool = False):
          # we initialise our variables 
         # File location for reading edges
         self.filepath: str = filepath
@@ -23,12 +133,19 @@ class TriangleCounter:
         self.memory_size: int = memory_size
         # Control flag for console output
         self.print_logs: bool = print_logs
-        # Edge reservoir  stores our sampled edges
-        self.edge_reservoir: Set[FrozenSet[int]] = set()
+        # Edge reservoir  stores our sampled edges, each mapped to its row in reservoir
+        self.edge_reservoir: Dict[Edge, int] = {}
+        # Same edges packed as int32 rows (8 bytes per edge), the first reservoir_size rows are live,
+        # so a random one can be picked and evicted in O(1)
+        self.reservoir: np.ndarray = np.empty((memory_size, 2), dtype=np.int32)
+        self.reservoir_size: int = 0
+        # Neighbours of every vertex inside the reservoir, kept in sync with edge_reservoir.
+        # python sets by default, sorted arrays (SortedNeighbors) pay off once reservoir degrees get large
+        self.adjacency: DefaultDict[int, Set[int]] = defaultdict(SortedNeighbors if sorted_adjacency else set)
         # Total edges processed from stream
         self.edges_processed: int = 0
-        # Per-vertex triangle counts
-        self.vertex_triangle_counts: DefaultDict[int, int] = defaultdict(int)
+        # Per-vertex triangle counts, indexed by vertex id (ids are dense in the SNAP graphs)
+        self.vertex_triangle_counts: np.ndarray = np.zeros(0, dtype=self.count_dtype)
         # Total triangle count in our sample
         self.sample_triangle_count: int = 0
 
@@ -47,62 +164,109 @@ class TriangleCounter:
         # then we return the max to ensure we never scale down
         return max(1.0, (n * (n - 1) * (n - 2)) / (m * (m - 1) * (m - 2)))
 
+    def reserve_vertices(self, n_vertices: int) -> None:
+        # grow the per-vertex counters so ids 0..n_vertices-1 can be indexed
+        counts = self.vertex_triangle_counts
+        if n_vertices > counts.size:
+            self.vertex_triangle_counts = np.zeros(n_vertices, dtype=self.count_dtype)
+            self.vertex_triangle_counts[:counts.size] = counts
+
+    def add_to_reservoir(self, edge: Edge) -> None:
+        # store the edge and link its endpoints in the adjacency
+        u, v = edge
+        if edge in self.edge_reservoir:
+            return
+        self.edge_reservoir[edge] = self.reservoir_size
+        self.reservoir[self.reservoir_size] = edge
+        self.reservoir_size += 1
+        if u == v:
+            return
+        self.adjacency[u].add(v)
+        self.adjacency[v].add(u)
+
+    def remove_from_reservoir(self, edge: Edge) -> None:
+        # drop the edge and unlink its endpoints, forgetting vertices left without neighbours
+        u, v = edge
+        # swap-pop: the last live row takes over the freed slot
+        idx = self.edge_reservoir.pop(edge)
+        self.reservoir_size -= 1
+        last = self.reservoir_size
+        if idx != last:
+            a, b = self.reservoir[last].tolist()
+            self.reservoir[idx] = (a, b)
+            self.edge_reservoir[(a, b)] = idx
+        for a, b in ((u, v), (v, u)):
+            neighbors = self.adjacency[a]
+            neighbors.discard(b)
+            if not neighbors:
+                del self.adjacency[a]
+
+    def random_reservoir_edge(self) -> Edge:
+        # a uniformly random edge of the reservoir
+        u, v = self.reservoir[random.randrange(self.reservoir_size)].tolist()
+        return (u, v)
+
+    def evict_random_edge(self) -> Edge:
+        # pick a uniformly random edge of the reservoir and remove it
+        edge = self.random_reservoir_edge()
+        self.remove_from_reservoir(edge)
+        return edge
+
     def should_add_to_reservoir(self, position: int) -> bool:
         # we fill reservoir with first memory_size edges
         if position <= self.memory_size:
             return True
         
         #  Probabilistic replacement with probability memory_size/position
-        elif bernoulli.rvs(p=self.memory_size / position):
-            # Select random edge for eviction
-            evicted_edge: FrozenSet[int] = random.choice(list(self.edge_reservoir))
-            self.edge_reservoir.remove(evicted_edge)
-            self.modify_triangle_counts(lambda current, delta: current - delta, evicted_edge)
+        elif random.random() * position < self.memory_size:
+            # Select random edge for eviction, its triangles are taken off while it is still linked
+            # in the adjacency (O(degree) intersection), then it is unlinked
+            evicted_edge = self.random_reservoir_edge()
+            self._apply_delta(evicted_edge, -1)
+            self.remove_from_reservoir(evicted_edge)
             
             return True
         else:
             # Skip this edge
             return False
 
-    def modify_triangle_counts(self, operation: Callable[[int, int], int], edge: FrozenSet[int]) -> None:
-        # Build neighbor lists for each endpoint
-        endpoint_neighbors = []
-        for endpoint in edge:
-            # Find all neighbors of this endpoint in reservoir
-            neighbors = set()
-            for existing_edge in self.edge_reservoir:
-                if endpoint in existing_edge:
-                    # Add the other vertex from this edge
-                    for vertex in existing_edge:
-                        if vertex != endpoint:
-                            neighbors.add(vertex)
-            endpoint_neighbors.append(neighbors)
-        
-        # just for safety check: need exactly 2 endpoints
-        if len(endpoint_neighbors) < 2:
+    def shared_neighbors(self, edge: Edge) -> Union[Set[int], np.ndarray]:
+        # Find common neighbors (vertices connected to both endpoints) straight from the adjacency
+        u, v = edge
+        # just for safety check: a self loop closes no triangle
+        if u == v:
+            return set()
+        a = self.adjacency.get(u)
+        b = self.adjacency.get(v)
+        if not a or not b:
+            return set()
+        # walk the smaller neighbourhood and probe the larger one, so the cost is O(min degree)
+        small, big = (a, b) if len(a) <= len(b) else (b, a)
+        return small.intersection(big)
+
+    @staticmethod
+    def _as_index(shared_neighbors) -> np.ndarray:
+        # shared vertices as an index array, SortedNeighbors already hands one back
+        if isinstance(shared_neighbors, np.ndarray):
+            return shared_neighbors
+        return np.fromiter(shared_neighbors, dtype=np.int64, count=len(shared_neighbors))
+
+    def _apply_delta(self, edge: Edge, sign: int) -> None:
+        # add (sign=+1) or remove (sign=-1) every triangle the edge closes in the sample
+        u, v = edge
+        shared_neighbors = self.shared_neighbors(edge)
+        if len(shared_neighbors) == 0:
             return
-        
-        # Find common neighbors (vertices connected to both endpoints)
-        shared_neighbors: Set[int] = reduce(
-            lambda set1, set2: set1 & set2,
-            endpoint_neighbors
-        )
-
-        # here we update counters for each triangle found
-        for shared_vertex in shared_neighbors:
-            # global triangle count
-            self.sample_triangle_count = operation(self.sample_triangle_count, 1)
-            
-            #count for our  shared vertex
-            self.vertex_triangle_counts[shared_vertex] = operation(
-                self.vertex_triangle_counts[shared_vertex], 1
-            )
+        counts = self.vertex_triangle_counts
+        delta = sign * len(shared_neighbors)
+
+        # global triangle count and both edge endpoints take part in every triangle found
+        self.sample_triangle_count += delta
+        counts[u] += delta
+        counts[v] += delta
 
-            #  counts for both edge endpoints
-            for endpoint in edge:
-                self.vertex_triangle_counts[endpoint] = operation(
-                    self.vertex_triangle_counts[endpoint], 1
-                )
+        #count for each shared vertex, in one fancy-indexed update (the vertices are distinct)
+        counts[self._as_index(shared_neighbors)] += sign
 
 
 class BaseTriestAlgorithm(TriangleCounter):
@@ -122,36 +286,35 @@ class BaseTriestAlgorithm(TriangleCounter):
         if self.print_logs:
             print(f"Executing TRIÈST-BASE with memory_size = {self.memory_size}")
 
-        with open(self.filepath, 'r') as file_stream:
-            if self.print_logs:
-                print("Stream processing started...")
+        # the whole file is parsed in one go, the loop below only walks python ints
+        us, vs = read_edges(self.filepath)
+        self.reserve_vertices(int(vs.max()) + 1 if vs.size else 0)
+        if self.print_logs:
+            print("Stream processing started...")
 
-            for line in file_stream:
-                # Parse current edge
-                current_edge = parse_edge_line(line)
-                
-                # Increment stream position
-                self.edges_processed += 1
+        # progress is logged every 1024 edges: one local flag and a mask test per edge
+        log = self.print_logs
+        log_mask = 1023
 
-                # Progress update
-                if self.print_logs and self.edges_processed % 1000 == 0:
-                    print(f"Processing edge {self.edges_processed}...")
+        for current_edge in zip(us.tolist(), vs.tolist()):
+            # Increment stream position
+            self.edges_processed += 1
 
-                # Reservoir sampling decision
-                if self.should_add_to_reservoir(self.edges_processed):
-                    # Update counts BEFORE adding to reservoir
-                    self.modify_triangle_counts(lambda x, y: x + y, current_edge)
-                    
-                    # Add to reservoir
-                    self.edge_reservoir.add(current_edge)
+            # Reservoir sampling decision
+            if self.should_add_to_reservoir(self.edges_processed):
+                # Update counts BEFORE adding to reservoir
+                self._apply_delta(current_edge, +1)
+                
+                # Add to reservoir
+                self.add_to_reservoir(current_edge)
 
-                # Periodic estimate display
-                if self.print_logs and self.edges_processed % 1000 == 0:
-                    current_estimate = self.scaling_factor * self.sample_triangle_count
-                    print(f"Current triangle estimate: {current_estimate}")
+            # Progress update and periodic estimate display
+            if log and (self.edges_processed & log_mask) == 0:
+                print(f"Processing edge {self.edges_processed}...")
+                print(f"Current triangle estimate: {self.scaling_factor * self.sample_triangle_count}")
 
-            # Final result: scale sample count
-            return self.scaling_factor * self.sample_triangle_count
+        # Final result: scale sample count
+        return self.scaling_factor * self.sample_triangle_count
 
 
 class ImprovedTriestAlgorithm(TriangleCounter):
@@ -161,6 +324,8 @@ class ImprovedTriestAlgorithm(TriangleCounter):
     with fixed memory and reduced variance using weighted updates.
     """
 
+    count_dtype = np.float64
+
     @property
     def incremental_scale(self) -> float:
         # Compute eta(t): scaling factor for triangles to ensure unbiased count
@@ -169,37 +334,27 @@ class ImprovedTriestAlgorithm(TriangleCounter):
         m = self.memory_size          # reservoir size
         return max(1.0, (n * (n - 1)) / (m * (m - 1)))  # scale ≥ 1
 
-    def modify_triangle_counts(self, operation: Callable[[int, int], int], edge: FrozenSet[int]) -> None:
+    def _apply_delta(self, edge: Edge, sign: int) -> None:
         """
         Update triangle counts for the current edge using eta(t) scaling.
         Always called before sampling decision.
         """
-        # Build neighbor sets from current edge reservoir
-        endpoint_neighbors = []
-        for endpoint in edge:
-            neighbors = {
-                vertex
-                for existing_edge in self.edge_reservoir if endpoint in existing_edge
-                for vertex in existing_edge if vertex != endpoint
-            }
-            endpoint_neighbors.append(neighbors)
-        
-        if len(endpoint_neighbors) < 2:
-            return  # Not enough neighbors to form a triangle
-        
         # Find shared neighbors → vertices completing triangles with this edge
-        shared_neighbors: Set[int] = reduce(
-            lambda a, b: a & b,
-            endpoint_neighbors
-        )
+        shared_neighbors = self.shared_neighbors(edge)
+        if len(shared_neighbors) == 0:
+            return
 
-        # Increment global and local triangle counters with scale
-        for shared_vertex in shared_neighbors:
-            self.sample_triangle_count += self.incremental_scale  # global count
-            self.vertex_triangle_counts[shared_vertex] += self.incremental_scale  # local count
+        # eta(t) only depends on t, so evaluate it once per edge rather than once per counter update
+        scale = sign * self.incremental_scale
+        counts = self.vertex_triangle_counts
+        u, v = edge
+        delta = scale * len(shared_neighbors)
 
-            for endpoint in edge:
-                self.vertex_triangle_counts[endpoint] += self.incremental_scale  # endpoints local count
+        # Increment global and local triangle counters with scale
+        self.sample_triangle_count += delta  # global count
+        counts[u] += delta  # endpoints local count
+        counts[v] += delta
+        counts[self._as_index(shared_neighbors)] += scale  # local count
 
     def should_add_to_reservoir(self, position: int) -> bool:
         """
@@ -208,10 +363,9 @@ class ImprovedTriestAlgorithm(TriangleCounter):
         """
         if position <= self.memory_size:
             return True
-        elif bernoulli.rvs(p=self.memory_size / position):
+        elif random.random() * position < self.memory_size:
             # Reservoir full: evict random edge to maintain size
-            evicted = random.choice(list(self.edge_reservoir))
-            self.edge_reservoir.remove(evicted)
+            self.evict_random_edge()
             return True
         else:
             return False  # Do not add this edge
@@ -224,31 +378,31 @@ class ImprovedTriestAlgorithm(TriangleCounter):
         if self.print_logs:
             print(f"Executing TRIÈST-IMPR with memory_size = {self.memory_size}")
 
-        with open(self.filepath, 'r') as file_stream:
-            if self.print_logs:
-                print("Stream processing started...")
+        us, vs = read_edges(self.filepath)
+        self.reserve_vertices(int(vs.max()) + 1 if vs.size else 0)
+        if self.print_logs:
+            print("Stream processing started...")
 
-            for line in file_stream:
-                current_edge = parse_edge_line(line)
-                self.edges_processed += 1
+        log = self.print_logs
+        log_mask = 1023
 
-                # Log progress every 1000 edges
-                if self.print_logs and self.edges_processed % 1000 == 0:
-                    print(f"Processing edge {self.edges_processed}...")
+        for current_edge in zip(us.tolist(), vs.tolist()):
+            self.edges_processed += 1
 
-                # Update counters BEFORE deciding to sample
-                self.modify_triangle_counts(lambda x, y: x + y, current_edge)
+            # Update counters BEFORE deciding to sample
+            self._apply_delta(current_edge, +1)
 
-                # Reservoir sampling decision
-                if self.should_add_to_reservoir(self.edges_processed):
-                    self.edge_reservoir.add(current_edge)
+            # Reservoir sampling decision
+            if self.should_add_to_reservoir(self.edges_processed):
+                self.add_to_reservoir(current_edge)
 
-                # Log current triangle estimate
-                if self.print_logs and self.edges_processed % 1000 == 0:
-                    print(f"Current triangle estimate: {self.sample_triangle_count}")
+            # Log progress and current triangle estimate every 1024 edges
+            if log and (self.edges_processed & log_mask) == 0:
+                print(f"Processing edge {self.edges_processed}...")
+                print(f"Current triangle estimate: {self.sample_triangle_count}")
 
-            # Return final estimate
-            return self.sample_triangle_count
+        # Return final estimate
+        return self.sample_triangle_count
 
 
 
@@ -4,19 +4,15 @@ class CompareSets:
         pass
 
     def union(self, v1, v2):
-        return list(set(v1 + v2))
+        return set(v1) | set(v2)
 
     def inter(self, v1, v2):
-        inter = []
-        for i in v1:
-            if i in v2:
-                inter.append(i)
-        return list(set(inter))
+        return set(v1) & set(v2)
 
     def jaccard_similarity(self, v1, v2):
-        union_set = self.union(v1, v2)
-        inter_set = self.inter(v1, v2)
-        return len(inter_set) / len(union_set)
+        # build each set once instead of once for the union and again for the intersection
+        s1, s2 = set(v1), set(v2)
+        return len(s1 & s2) / len(s1 | s2)
     
 
-    
\ No newline at end of file
+    
@@ -1,12 +1,13 @@
+import numpy as np
+
+
 class Comparesignature:
     def __init__(self):
         pass
 
     @staticmethod
     def CompareSignatures(vec1, vec2):
+        vec1, vec2 = np.asarray(vec1), np.asarray(vec2)
         assert len(vec1) == len(vec2)
-        count = 0
-        for i in range(len(vec1)):
-            if vec1[i] == vec2[i]:
-                count += 1
-        return count / len(vec1)
+        # fraction of positions where the two signatures agree
+        return float((vec1 == vec2).mean())
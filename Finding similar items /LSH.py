@@ -1,8 +1,5 @@
-from collections import defaultdict
 from math import ceil
-from Comparesignature import Comparesignature
-import zlib
-
+import numpy as np
 
 
 class LSH:
@@ -10,52 +7,74 @@ class LSH:
         self.num_bandes = num_bandes
         self.threshold = threshold  # Threshold for filtering final pairs
 
-    def split_bandes(self, signature):
-        n = len(signature)
+    def band_bounds(self, n):
         rows = ceil(n / self.num_bandes)  # ceil here because it's  safer than integer division
-        bandes = []
-        for i in range(self.num_bandes):
-            start = i * rows
-            end = min(start + rows, n)
-            bandes.append(signature[start:end])
-        return bandes
+        # with more bands than rows allow, the trailing bands are empty (start == end == n)
+        return [(min(i * rows, n), min(i * rows + rows, n)) for i in range(self.num_bandes)]
+
+    def band_buckets(self, signatures):
+        # (n_docs, num_bandes) matrix of bucket ids: two documents share an id in a band exactly when
+        # that band of their signatures is identical. Each band's rows are viewed as single opaque
+        # byte strings and bucketed by one np.unique sort, no hashing and no collisions
+        signatures = np.asarray(signatures)
+        n_docs, n = signatures.shape
+        bounds = self.band_bounds(n)
+        buckets = np.zeros((n_docs, self.num_bandes), dtype=np.int64)
+        for band_ind, (start, end) in enumerate(bounds):
+            if end > start:
+                band = np.ascontiguousarray(signatures[:, start:end])
+                keys = band.view(np.dtype((np.void, band.itemsize * (end - start)))).ravel()
+                buckets[:, band_ind] = np.unique(keys, return_inverse=True)[1].ravel()
+        return buckets, bounds
 
     def get_candidates(self, signatures):
-        n_docs = len(signatures)
-        all_bandes = [self.split_bandes(sig) for sig in signatures]
-        candidate_pairs = set()
-
-        for band_ind in range(self.num_bandes):
-            buckets = defaultdict(list)
-            for doc_index in range(n_docs):
-                workingband = all_bandes[doc_index][band_ind]
-                if len(workingband) == 0:
-                    continue
-                # Stable hash using zlib.crc32
-                h = zlib.crc32(bytes(str(tuple(map(int, workingband))), encoding='utf8'))
-                buckets[h].append(doc_index)
-
-            # Form candidate pairs
-            for bucket_docs in buckets.values():
-                if len(bucket_docs) > 1:
-                    for i in range(len(bucket_docs)):
-                        for j in range(i + 1, len(bucket_docs)):
-                            candidate_pairs.add((bucket_docs[i], bucket_docs[j]))
-
-        return candidate_pairs
-
-    def filter_candidates(self, signatures, candidates):
-       
-        filtered = set()
-        for i, j in candidates:
-            sim = Comparesignature.CompareSignatures(signatures[i], signatures[j])
-            if sim >= self.threshold:
-                filtered.add((i, j))
-        return filtered
-
-    def run(self, signatures):
-       
-        candidates = self.get_candidates(signatures)
-        return self.filter_candidates(signatures, candidates)
+        if len(signatures) == 0:
+            return np.empty((0, 2), dtype=np.int64)
+        buckets, bounds = self.band_buckets(signatures)
+        firsts, seconds = [], []
+
+        for band_ind, (start, end) in enumerate(bounds):
+            # empty bands were never bucketed, their all-zero column would pair every document
+            if end <= start:
+                continue
+            # buckets = runs of equal ids after one (stable) sort of the band column
+            order = np.argsort(buckets[:, band_ind], kind="stable")
+            sorted_ids = buckets[order, band_ind]
+            starts = np.r_[0, np.flatnonzero(np.diff(sorted_ids) != 0) + 1]
+            sizes = np.diff(np.r_[starts, order.size])
 
+            # Form candidate pairs, only buckets holding more than one document matter
+            for first, size in zip(starts[sizes > 1].tolist(), sizes[sizes > 1].tolist()):
+                bucket_docs = order[first:first + size]
+                i, j = np.triu_indices(size, 1)
+                firsts.append(bucket_docs[i])
+                seconds.append(bucket_docs[j])
 
+        if not firsts:
+            return np.empty((0, 2), dtype=np.int64)
+        # (K, 2) array of (i, j) pairs with i < j, pairs found in several bands kept once
+        return np.unique(np.column_stack([np.concatenate(firsts), np.concatenate(seconds)]), axis=0)
+
+    def filter_candidates(self, signatures, candidates, set_sizes=None):
+        # candidates: (K, 2) array from get_candidates, any iterable of (i, j) pairs works too
+        if not isinstance(candidates, np.ndarray):
+            candidates = list(candidates)
+        pairs = np.asarray(candidates, dtype=np.int64).reshape(-1, 2)
+        if set_sizes is not None and pairs.size:
+            # length filter: Jaccard(A, B) <= min(|A|, |B|) / max(|A|, |B|), so pairs whose shingle set
+            # sizes are too far apart can't reach the threshold and are dropped before any comparison
+            set_sizes = np.asarray(set_sizes)
+            a, b = set_sizes[pairs[:, 0]], set_sizes[pairs[:, 1]]
+            pairs = pairs[np.minimum(a, b) >= self.threshold * np.maximum(a, b)]
+        if pairs.size == 0:
+            return pairs
+        signatures = np.asarray(signatures)
+        # similarity of every candidate pair in one go: fraction of matching signature entries
+        sims = (signatures[pairs[:, 0]] == signatures[pairs[:, 1]]).mean(axis=1)
+        return pairs[sims >= self.threshold]
+
+    def run(self, signatures, set_sizes=None):
+        # candidate pairs from the band buckets, then keep those whose signatures agree enough
+        # (set_sizes: number of distinct shingles per document, enables the length filter)
+        candidates = self.get_candidates(signatures)
+        return self.filter_candidates(signatures, candidates, set_sizes)
@@ -1,28 +1,102 @@
 import random
+import numpy as np
 from CompareSets import CompareSets
 
+try:
+    from numba import njit
+except ImportError:  # numba is optional, fall back to numpy broadcasting
+    njit = None
+
+
+if njit is not None:
+    @njit("int64(int64, int64, int64, int64)", cache=True)
+    def universal_hash(a, b, s, prime):
+        # (a*s + b) % prime; a*s can reach 2**64, so multiply by the two 16-bit halves of s to stay inside int64
+        v = (((a * (s >> 16)) % prime) << 16) + a * (s & 0xFFFF)
+        return (v + b) % prime
+
+    # compiled eagerly for this exact signature, so the JIT cost is paid once at import
+    @njit("int64[:](int64[:], int64[:], int64[:], int64, int64)", cache=True)
+    def minhash(shingles, a, b, prime, max_hash):
+        out = np.empty(a.size, dtype=np.int64)
+        for i in range(a.size):
+            m = max_hash
+            for s in shingles:
+                v = universal_hash(a[i], b[i], s, prime)
+                if v < m:
+                    m = v
+            out[i] = m
+        return out
+
+    @njit("int64[:](int64[:], int64[:], int64[:], int64, int64)", cache=True)
+    def minmaxhash(shingles, a, b, prime, max_hash):
+        # mins of every hash function followed by their maxes, both from the same pass over the shingles
+        out = np.empty(2 * a.size, dtype=np.int64)
+        for i in range(a.size):
+            lo = max_hash
+            hi = 0
+            for s in shingles:
+                v = universal_hash(a[i], b[i], s, prime)
+                if v < lo:
+                    lo = v
+                if v > hi:
+                    hi = v
+            out[i] = lo
+            out[a.size + i] = min(hi, max_hash)
+        return out
+else:
+    def universal_hash(a, b, s, prime):
+        # numpy version: (a*s + b) % prime for all hash functions against a block of shingles,
+        # same 16-bit split as the compiled kernel so nothing overflows int64
+        v = (((a * (s >> 16)) % prime) << 16) + a * (s & 0xFFFF)
+        return (v + b) % prime
+
+    def minhash(shingles, a, b, prime, max_hash, block=4096):
+        # all hash functions against a block of shingles at once, keeping a running min
+        out = np.full(a.size, max_hash, dtype=np.int64)
+        a, b = a[:, None], b[:, None]
+        for start in range(0, shingles.size, block):
+            v = universal_hash(a, b, shingles[None, start:start + block], prime)
+            np.minimum(out, v.min(axis=1), out=out)
+        return out
+
+    def minmaxhash(shingles, a, b, prime, max_hash, block=4096):
+        lo = np.full(a.size, max_hash, dtype=np.int64)
+        hi = np.zeros(a.size, dtype=np.int64)
+        a, b = a[:, None], b[:, None]
+        for start in range(0, shingles.size, block):
+            v = universal_hash(a, b, shingles[None, start:start + block], prime)
+            np.minimum(lo, v.min(axis=1), out=lo)
+            np.maximum(hi, v.max(axis=1), out=hi)
+        return np.concatenate([lo, np.minimum(hi, max_hash)])
+
+
 class MinHashing:
-    def __init__(self, num_hashes=100):
+    def __init__(self, num_hashes=100, min_max=False):
         self.num_hashes = num_hashes
+        # Min-Max hashing: each hash function gives its min and its max, so half as many functions
+        # fill a signature of the same length (still an unbiased Jaccard estimate)
+        self.min_max = min_max
         self.max_hash = 2**32 - 1
         self.prime = 4294967311  # a large prime number 
         # Generate random coefficients for hash functions
         random.seed(42)
+        n_funcs = (num_hashes + 1) // 2 if min_max else num_hashes
         self.hash_funcs = [
             (random.randint(1, self.prime - 1), random.randint(0, self.prime - 1)) #h(x) = (a*x +b )%c 
-            for _ in range(num_hashes)
+            for _ in range(n_funcs)
         ]
+        # same coefficients as arrays for the minhash kernel
+        self.a = np.array([a for a, _ in self.hash_funcs], dtype=np.int64)
+        self.b = np.array([b for _, b in self.hash_funcs], dtype=np.int64)
 
     def compute_signature(self, hashed_shingles):
-
-        signature = []
-        for a, b in self.hash_funcs:
-            min_hash_val = self.max_hash
-            for shingle in hashed_shingles:
-                # compute hash function value for this shingle
-                hash_val = (a * shingle + b) % self.prime
-                if hash_val < min_hash_val:
-                    min_hash_val = hash_val
-            signature.append(min_hash_val)
-        return signature
+        shingles = np.asarray(hashed_shingles, dtype=np.int64)
+        if self.min_max:
+            # mins then maxes, trimmed back to num_hashes when it is odd
+            signature = minmaxhash(shingles, self.a, self.b, self.prime, self.max_hash)[:self.num_hashes]
+        else:
+            signature = minhash(shingles, self.a, self.b, self.prime, self.max_hash)
+        # every value is capped at max_hash = 2**32 - 1, so the signature fits in uint32
+        return signature.astype(np.uint32)
     
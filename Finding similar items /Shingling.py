@@ -1,27 +1,26 @@
 
 import random
+import numpy as np
 
 class Shingling:
     def __init__(self, k):
         self.k = k
-        self.shingles = []
          
 
     # Character shingles
     def create_shingles_char(self, text):
-        self.shingles = [text[i:i+self.k] for i in range(len(text)-self.k+1)]
-        return self.shingles
+        return [text[i:i+self.k] for i in range(len(text)-self.k+1)]
 
     # Word shingles
     def create_shingles_word(self, text):
         words = text.split()
-        self.shingles = [" ".join(words[i:i+self.k]) for i in range(len(words)-self.k+1)]
-        return self.shingles
+        return [" ".join(words[i:i+self.k]) for i in range(len(words)-self.k+1)]
 
     # Hashing shingles
-    def hashing(self):
-        hashed_shingles = [hash(s) % 2**32 for s in self.shingles]  # modulo to limit the size 
-        return hashed_shingles
+    @staticmethod
+    def hashing(shingles):
+        # masking keeps the low 32 bits, same as % 2**32, straight into a uint32 array for minhashing
+        return np.fromiter((hash(s) & 0xFFFFFFFF for s in shingles), dtype=np.uint32, count=len(shingles))
 
 
 """#try 
@@ -30,11 +29,11 @@ sh = Shingling(k=2)
 
 # Word shingles
 print(sh.create_shingles_word(doc))
-print(sh.hashing())
+print(sh.hashing(sh.create_shingles_word(doc)))
 # / : considered as a word ' not a word 
 
 # Character shingles
 #sh.k = 7
 print(sh.create_shingles_char(doc))
-print(sh.hashing())
+print(sh.hashing(sh.create_shingles_char(doc)))
 """
\ No newline at end of file
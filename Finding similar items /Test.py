@@ -3,6 +3,8 @@ import pandas as pd
 import matplotlib.pyplot as plt
 import random
 import time
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
 from collections import defaultdict
 from Shingling import Shingling
 from MinHashing import MinHashing
@@ -11,44 +13,6 @@ from LSH import LSH
 # to reduce the randomness of shinging .. 
 random.seed(42)
 
-# Loading data that's on the file archive(1) if you change the folder name change it here in the file path before runing the code please
-file_path = "archive(1)/Articles.csv"
-df = pd.read_csv(file_path, encoding='latin1')
-
-# Limit to 1000 documents 
-documents = df['Article'].tolist()[:1000]
-print("Number of documents used:", len(documents))
-
-  # parameters 
-k = 2                # size of each shingle
-num_hashes = 20      # Number of hash functions
-num_bands = 5        # Number of bands for LSH
-threshold = 0.8      # Similarity threshold
-
-print("\n--- Generating MinHash signatures ---")
-
-sh = Shingling(k=k)
-mh = MinHashing(num_hashes=num_hashes)
-
-signatures = []
-for doc in documents:
-    # Step 1: Create shingles from words
-    shingles = sh.create_shingles_word(doc)
-    # Step 2: Hash shingles to numerical values
-    hashed_shingles = sh.hashing()
-    # Step 3: Computing MinHash signature for the document
-    sig = mh.compute_signature(hashed_shingles)
-    signatures.append(sig)
-
-print("Total signatures generated:", len(signatures))
-
-# LSH 
-print("\n--- Running LSH to find candidate pairs ---")
-
-lsh = LSH(num_bandes=num_bands, threshold=threshold)
-candidate_pairs = lsh.run(signatures)
-print("Candidate pairs found:", candidate_pairs)
-
 # plots for results on eport 
 
 #  Effect of number of bands on candidate pairs
@@ -94,28 +58,45 @@ def test_threshold(signatures, thresholds, num_bandes=5):
 
 #  Effect of number of hash functions
 
-def test_num_hashes(documents, hash_list, k=2, num_bandes=5, threshold=0.8):
-    results = []
-    sh = Shingling(k=k)
-    
+# hashed shingles of every document, handed once to each sweep worker
+_hashed_docs = None
+
+def _init_sweep(hashed_docs):
+    global _hashed_docs
+    _hashed_docs = hashed_docs
+
+def _sweep_num_hashes(nh, min_max, num_bandes, threshold):
+    """ one point of test_num_hashes: sign every document then run LSH, returns (candidates, signing time) """
+    mh = MinHashing(num_hashes=nh, min_max=min_max)
+    start_time = time.time()
+    signatures = np.vstack([mh.compute_signature(hashed_shingles) for hashed_shingles in _hashed_docs])
+    elapsed = time.time() - start_time
+    lsh = LSH(num_bandes=num_bandes, threshold=threshold)
+    return len(lsh.run(signatures)), elapsed
+
+def test_num_hashes(documents, hash_list, k=2, num_bandes=5, threshold=0.8, hashed_docs=None):
+    # shingles only depend on k, so they are hashed once for the whole sweep
+    # (or passed in already hashed when the caller has them for the same k)
+    if hashed_docs is None:
+        sh = Shingling(k=k)
+        hashed_docs = [sh.hashing(sh.create_shingles_word(doc)) for doc in documents]
+
+    # plain MinHash against Min-Max hashing (half the hash functions for the same signature length)
+    variants = [(False, 'red', 'MinHash'), (True, 'orange', 'Min-Max hash')]
+    # every (variant, nh) point is independent (MinHashing reseeds itself), so they run in parallel
+    with ProcessPoolExecutor(initializer=_init_sweep, initargs=(hashed_docs,)) as ex:
+        futures = {(min_max, nh): ex.submit(_sweep_num_hashes, nh, min_max, num_bandes, threshold)
+                   for min_max, _, _ in variants for nh in hash_list}
+
+        plt.figure(figsize=(8,5))
+        for min_max, color, label in variants:
+            results, times = zip(*[futures[min_max, nh].result() for nh in hash_list])
+            plt.plot(hash_list, results, marker='o', color=color, label=f"{label} ({sum(times):.2f}s signing)")
 
-    for nh in hash_list:
-        mh = MinHashing(num_hashes=nh)
-        signatures = []
-        for doc in documents:
-            shingles = sh.create_shingles_word(doc)
-            hashed_shingles = sh.hashing()
-            sig = mh.compute_signature(hashed_shingles)
-            signatures.append(sig)
-        lsh = LSH(num_bandes=num_bandes, threshold=threshold)
-        candidates = lsh.run(signatures)
-        results.append(len(candidates))
-    
-    plt.figure(figsize=(8,5))
-    plt.plot(hash_list, results, marker='o', color='red')
     plt.xlabel("Number of Hash Functions")
     plt.ylabel("Number of Candidate Pairs")
     plt.title("Effect of Number of Hash Functions on Candidate Pairs")
+    plt.legend()
     plt.grid(True, alpha=0.3)
     plt.show()
 
@@ -147,12 +128,61 @@ def test_lsh_execution_time(signatures, band_list, threshold=0.8, num_runs=3):
     plt.grid(True, alpha=0.3)
     plt.show()
 
-#runing  experiments 
-band_list = [2, 3, 5, 6] #because number of hash function is 20 
-thresholds = [0.5, 0.6, 0.7, 0.8, 0.9]
-hash_list = [10, 20, 50, 100]
 
-test_num_bands(signatures, band_list)
-test_threshold(signatures, thresholds)
-test_num_hashes(documents, hash_list)
-test_lsh_execution_time(signatures, band_list, num_runs=3)
+# the sweep workers re-import this file, so the experiments only run when it is executed
+if __name__ == "__main__":
+    # Loading data that's on the file archive(1) if you change the folder name change it here in the file path before runing the code please
+    file_path = "archive(1)/Articles.csv"
+    df = pd.read_csv(file_path, encoding='latin1')
+
+    # Limit to 1000 documents 
+    documents = df['Article'].tolist()[:1000]
+    print("Number of documents used:", len(documents))
+
+      # parameters 
+    k = 2                # size of each shingle
+    num_hashes = 20      # Number of hash functions
+    num_bands = 5        # Number of bands for LSH
+    threshold = 0.8      # Similarity threshold
+
+    print("\n--- Generating MinHash signatures ---")
+
+    sh = Shingling(k=k)
+    mh = MinHashing(num_hashes=num_hashes)
+
+    hashed_docs = []
+    for doc in documents:
+        # Step 1: Create shingles from words
+        shingles = sh.create_shingles_word(doc)
+        # Step 2: Hash shingles to numerical values (kept, they don't depend on the hash functions)
+        hashed_docs.append(sh.hashing(shingles))
+
+    signatures = []
+    for hashed_shingles in hashed_docs:
+        # Step 3: Computing MinHash signature for the document
+        sig = mh.compute_signature(hashed_shingles)
+        signatures.append(sig)
+
+    # one (n_docs, num_hashes) matrix, so a document's signature is just a row
+    signatures = np.vstack(signatures)
+    print("Total signatures generated:", len(signatures))
+
+    # LSH 
+    print("\n--- Running LSH to find candidate pairs ---")
+
+    # distinct shingles per document, lets LSH skip pairs whose sizes alone rule out the threshold
+    set_sizes = np.array([np.unique(hashed_shingles).size for hashed_shingles in hashed_docs])
+
+    lsh = LSH(num_bandes=num_bands, threshold=threshold)
+    candidate_pairs = lsh.run(signatures, set_sizes)
+    print("Candidate pairs found:", candidate_pairs)
+
+    #runing  experiments 
+    band_list = [2, 3, 5, 6] #because number of hash function is 20 
+    thresholds = [0.5, 0.6, 0.7, 0.8, 0.9]
+    hash_list = [10, 20, 50, 100]
+
+    test_num_bands(signatures, band_list)
+    test_threshold(signatures, thresholds)
+    test_num_hashes(documents, hash_list, k=k, hashed_docs=hashed_docs)
+    test_lsh_execution_time(signatures, band_list, num_runs=3)
@@ -1,61 +1,131 @@
-from collections import Counter
 from itertools import combinations
+import numpy as np
 
-def baskets(path):
+def load_baskets(path):
+    """ parse the file once into a flat CSR layout: basket t is items[indptr[t]:indptr[t+1]] """
     with open(path) as f:
-        for line in f:
-            yield tuple(map(int, line.split()))
+        text = f.read()
+    sizes = [len(line.split()) for line in text.splitlines() if line.strip()]
+    # np.fromstring reads a whitespace-only text as a single 0, so an empty file gets no items at all
+    items = np.fromstring(text, dtype=np.int32, sep=" ") if sizes else np.empty(0, dtype=np.int32)
+    indptr = np.zeros(len(sizes) + 1, dtype=np.int64)
+    np.cumsum(sizes, out=indptr[1:])
+    # fromstring silently stops at the first token that is not an integer
+    if len(items) != indptr[-1]:
+        raise ValueError(f"{path}: non-integer item after the first {len(items)} items")
+    return items, indptr
+
+def baskets(transactions):
+    """ yields every basket as a tuple of ints; transactions is a path or the (items, indptr) pair of load_baskets """
+    items, indptr = load_baskets(transactions) if isinstance(transactions, str) else transactions
+    items = items.tolist()
+    for start, end in zip(indptr[:-1].tolist(), indptr[1:].tolist()):
+        yield tuple(sorted(items[start:end]))
+
+def item_bitmaps(transactions, items):
+    """
+    vertical bitset layout: row r packs the baskets containing items[r] into uint64 words, one bit per basket
+    returns the (len(items), nwords) bitmap matrix and the (item,) -> row mapping
+    """
+    basket_items, indptr = transactions
+    n = len(indptr) - 1
+    nwords = (n + 63) // 64
+    row = {(item,): r for r, item in enumerate(items)}
+    if not row:
+        # no frequent item (e.g. an empty file): nothing to pack
+        return np.zeros((0, nwords), dtype=np.uint64), row
+
+    # dense row of every (item, basket) entry, -1 for items that are not kept
+    lookup = np.full(int(basket_items.max()) + 1, -1, dtype=np.int64)
+    lookup[np.asarray(items, dtype=np.int64)] = np.arange(len(items))
+    rows = lookup[basket_items]
+    tids = np.repeat(np.arange(n, dtype=np.int64), np.diff(indptr))
+    keep = rows >= 0
+    rows, tids = rows[keep], tids[keep]
+
+    bitmaps = np.zeros(len(items) * nwords, dtype=np.uint64)
+    # or.at is unbuffered, so an item listed twice in a basket just sets its bit twice
+    np.bitwise_or.at(bitmaps, rows * nwords + (tids >> 6), np.left_shift(np.uint64(1), (tids & 63).astype(np.uint64)))
+    return bitmaps.reshape(len(items), nwords), row
+
+def popcount_rows(words):
+    """ number of bits set in each row of a uint64 matrix (np.bitwise_count is numpy >= 2.0) """
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(words).sum(axis=1, dtype=np.int64)
+    return np.unpackbits(words.view(np.uint8), axis=1).sum(axis=1, dtype=np.int64)
 
 def apriori_gen(Lk):
-    L = list(Lk)
+    """ itemsets are sorted tuples: join the ones sharing their first k-2 items, then prune """
+    L = sorted(Lk)
     k = len(L[0]) + 1
     Ck = set()
     for i in range(len(L)):
+        a = L[i]
         for j in range(i+1, len(L)):
-            a, b = L[i], L[j]
-            union = a | b
-            if len(union) == k:
-                if all(frozenset(sub) in Lk for sub in combinations(union, k-1)):
-                    Ck.add(union)
+            b = L[j]
+            # L is sorted, so once the prefix differs no later itemset can join with a
+            if a[:-1] != b[:-1]:
+                break
+            cand = a + b[-1:]
+            if all(sub in Lk for sub in combinations(cand, k-1)):
+                Ck.add(cand)
     return Ck
 
-def count_support(candidates, path, k):
-    """ support counting using combinations of baskets."""
-    candidate_set = set(candidates)
-    counter = Counter()
-
-    for t in baskets(path):
-        # generate only k-combinations from this transaction
-        for combo in combinations(t, k):
-            fs = frozenset(combo)
-            if fs in candidate_set:
-                counter[fs] += 1
-
-    return counter
+def count_support(candidates, prev, singles, min_sup, block_bytes=1 << 26):
+    """
+    ECLAT-style counting on bitmap tid-sets: prev and singles are (bitmaps, row) pairs for the frequent
+    (k-1)-itemsets and the frequent items, a candidate is its frequent prefix plus one item, so
+    tids(c) = tids(c[:-1]) & tids(c[-1:]) and its support is the popcount of that
+    returns the supports of all candidates and the (bitmaps, row) of the frequent ones for the next pass
+    candidates go through in blocks so the AND buffer stays around block_bytes
+    """
+    candidates = list(candidates)
+    prev_bitmaps, prev_row = prev
+    single_bitmaps, single_row = singles
+    if not candidates:
+        return {}, (prev_bitmaps[:0], {})
+    prefix = np.array([prev_row[c[:-1]] for c in candidates], dtype=np.int64)
+    last = np.array([single_row[c[-1:]] for c in candidates], dtype=np.int64)
+    block = max(1, block_bytes // single_bitmaps[0].nbytes)
+
+    supports = np.empty(len(candidates), dtype=np.int64)
+    frequent = []
+    for start in range(0, len(candidates), block):
+        acc = prev_bitmaps[prefix[start:start+block]]
+        acc &= single_bitmaps[last[start:start+block]]
+        s = popcount_rows(acc)
+        supports[start:start+block] = s
+        frequent.append(acc[s >= min_sup])
+
+    keys = [c for c, s in zip(candidates, supports.tolist()) if s >= min_sup]
+    return dict(zip(candidates, supports.tolist())), (np.concatenate(frequent), {c: r for r, c in enumerate(keys)})
 
 def apriori(path, min_sup):
-    # L1
-    counts = Counter()
-    for t in baskets(path):
-        for item in t:
-            counts[frozenset([item])] += 1
+    # the file is read once, every pass below walks the in-memory baskets
+    transactions = load_baskets(path)
 
-    Lk = {i: s for i, s in counts.items() if s >= min_sup}
+    # L1, counted straight on the flat item array
+    items, counts = np.unique(transactions[0], return_counts=True)
+    keep = counts >= min_sup
+    Lk = {(i,): s for i, s in zip(items[keep].tolist(), counts[keep].tolist())}
     all_freq = dict(Lk)
 
-    k = 2
+    # every later candidate is made of frequent items, so only their bitmaps are needed
+    singles = item_bitmaps(transactions, items[keep].tolist())
+    # tid-sets of the frequent itemsets of the previous pass
+    prev = singles
+
     while Lk:
         Ck = apriori_gen(Lk)
         if not Ck:
             break
 
-        supports = count_support(Ck, path, k)
+        supports, prev = count_support(Ck, prev, singles, min_sup)
         Lk = {c: s for c, s in supports.items() if s >= min_sup}
         all_freq.update(Lk)
 
-        k += 1
-
-    return all_freq
+    # sorted tuples are only the internal key, callers get frozensets
+    return {frozenset(itemset): s for itemset, s in all_freq.items()}
 
 def generate_rules(frequent_itemsets, min_conf):
     """
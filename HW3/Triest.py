@@ -1,67 +1,307 @@
-from typing import Set, FrozenSet, DefaultDict
+from typing import Set, DefaultDict, List, Dict, Optional, Tuple
 from collections import defaultdict
-import random
+import numpy as np
 
+try:
+    import triest_core  # compiled stream loop, build it with `cythonize -i triest_core.pyx`
+except ImportError:
+    triest_core = None
 
-def _get_edge(line: str) -> FrozenSet[int]:
-    parts = line.strip().split()
-    if len(parts) >= 2:
-        return frozenset([int(parts[0]), int(parts[1])])
-    return frozenset()
+try:
+    from numba import njit, types
+    from numba import typed
+except ImportError:  # numba is optional, run() does the same work in plain Python
+    njit = None
+
+# an edge is stored as (u, v) with u < v so both directions map to the same key
+Edge = Tuple[int, int]
+
+
+def edge_keys(edges: np.ndarray) -> np.ndarray:
+    """Pack each (u, v) row, u < v, into a single uint64 (u << 32) | v (vertex ids must fit in 32 bits)."""
+    edges = edges.astype(np.uint64, copy=False)
+    return (edges[:, 0] << np.uint64(32)) | edges[:, 1]
+
+
+if njit is not None:
+    _neighbours_type = types.int64[:]
+
+    @njit(cache=True)
+    def _link(adj, u, v):
+        """Insert v into the sorted neighbour array of u, returns False if it was already there."""
+        if u not in adj:
+            nbrs = np.empty(1, dtype=np.int64)
+            nbrs[0] = v
+            adj[u] = nbrs
+            return True
+        old = adj[u]
+        i = np.searchsorted(old, v)
+        if i < old.size and old[i] == v:
+            return False
+        nbrs = np.empty(old.size + 1, dtype=np.int64)
+        nbrs[:i] = old[:i]
+        nbrs[i] = v
+        nbrs[i + 1:] = old[i:]
+        adj[u] = nbrs
+        return True
+
+    @njit(cache=True)
+    def _unlink(adj, u, v):
+        """Remove v from the sorted neighbour array of u, dropping u once it has no neighbour left."""
+        old = adj[u]
+        if old.size == 1:
+            adj.pop(u)
+            return
+        i = np.searchsorted(old, v)
+        nbrs = np.empty(old.size - 1, dtype=np.int64)
+        nbrs[:i] = old[:i]
+        nbrs[i:] = old[i + 1:]
+        adj[u] = nbrs
+
+    @njit(cache=True)
+    def _bump(counts, key, delta):
+        value = counts.get(key, delta * 0) + delta
+        if value == 0:
+            counts.pop(key)
+        else:
+            counts[key] = value
+
+    @njit(cache=True)
+    def _update(u, v, adj, tau_vertices, weight):
+        """
+        Add weight to every common neighbour c of u and v (two-pointer merge of their sorted arrays)
+        and n * weight to u and v. Returns n, the number of triangles closed by (u, v).
+        """
+        if u not in adj or v not in adj:
+            return 0
+        a = adj[u]
+        b = adj[v]
+        i = j = n = 0
+        while i < a.size and j < b.size:
+            if a[i] < b[j]:
+                i += 1
+            elif a[i] > b[j]:
+                j += 1
+            else:
+                _bump(tau_vertices, a[i], weight)
+                n += 1
+                i += 1
+                j += 1
+        if n:
+            _bump(tau_vertices, u, n * weight)
+            _bump(tau_vertices, v, n * weight)
+        return n
+
+    @njit(cache=True)
+    def _evict(sample, adj, j, size):
+        """Swap-and-pop slot j of the sample's first size rows (same slot order as S_list), returns the removed edge."""
+        a = sample[j, 0]
+        b = sample[j, 1]
+        sample[j, 0] = sample[size - 1, 0]
+        sample[j, 1] = sample[size - 1, 1]
+        _unlink(adj, a, b)
+        _unlink(adj, b, a)
+        return a, b
+
+    @njit(cache=True)
+    def _items(counts, values):
+        """Keys of counts as an array, its values written into values."""
+        keys = np.empty(len(counts), dtype=np.int64)
+        for i, (key, value) in enumerate(counts.items()):
+            keys[i] = key
+            values[i] = value
+        return keys
+
+    @njit(cache=True)
+    def run_base_loop(edges, accept, evict, M):
+        """TRIÈST-BASE stream loop of TriestBase.run over precomputed sampling decisions."""
+        adj = typed.Dict.empty(key_type=types.int64, value_type=_neighbours_type)
+        tau_vertices = typed.Dict.empty(key_type=types.int64, value_type=types.int64)
+        sample = np.empty((M, 2), dtype=np.int64)
+        size = 0
+        tau = 0
+        for i in range(edges.shape[0]):
+            if not accept[i]:
+                continue
+            u = edges[i, 0]
+            v = edges[i, 1]
+            if i >= M:
+                a, b = _evict(sample, adj, int(evict[i] * size), size)
+                size -= 1
+                tau -= _update(a, b, adj, tau_vertices, -1)
+            # an edge repeated in the stream (skip_duplicates=False) is kept once, like S
+            if _link(adj, u, v):
+                _link(adj, v, u)
+                sample[size, 0] = u
+                sample[size, 1] = v
+                size += 1
+            tau += _update(u, v, adj, tau_vertices, 1)
+        values = np.empty(len(tau_vertices), dtype=np.int64)
+        return tau, _items(tau_vertices, values), values
+
+    @njit(cache=True)
+    def run_impr_loop(edges, accept, evict, M):
+        """TRIÈST-IMPR stream loop of TriestImpr.run over precomputed sampling decisions."""
+        adj = typed.Dict.empty(key_type=types.int64, value_type=_neighbours_type)
+        tau_vertices = typed.Dict.empty(key_type=types.int64, value_type=types.float64)
+        sample = np.empty((M, 2), dtype=np.int64)
+        den = M * (M - 1)
+        size = 0
+        tau = 0.0
+        for i in range(edges.shape[0]):
+            t = i + 1
+            u = edges[i, 0]
+            v = edges[i, 1]
+            weight = 1.0
+            if t >= 3:
+                weight = max(1.0, (t - 1) * (t - 2) / den)
+            tau += _update(u, v, adj, tau_vertices, weight) * weight
+            if not accept[i]:
+                continue
+            if t > M:
+                _evict(sample, adj, int(evict[i] * size), size)
+                size -= 1
+            if _link(adj, u, v):
+                _link(adj, v, u)
+                sample[size, 0] = u
+                sample[size, 1] = v
+                size += 1
+        values = np.empty(len(tau_vertices), dtype=np.float64)
+        return tau, _items(tau_vertices, values), values
 
 
 class TriestBase:
-    def __init__(self, file: str, M: int, verbose: bool = True, skip_duplicates: bool = True):
+    def __init__(self, file: str, M: int, verbose: bool = True, skip_duplicates: bool = True,
+                 seed: Optional[int] = None):
         self.file: str = file
         self.M: int = M
         self.verbose: bool = verbose
         self.skip_duplicates: bool = skip_duplicates
-        self.S: Set[FrozenSet[int]] = set()
+        self.S: Set[Edge] = set()
+        # list + index mirror of S so a random edge can be drawn and removed in O(1)
+        self.S_list: List[Edge] = []
+        self.S_index: Dict[Edge, int] = {}
+        # neighbours of each vertex in the sample, kept in sync with S
+        self.adj: DefaultDict[int, Set[int]] = defaultdict(set)
         self.t: int = 0
         self.tau: int = 0
         self.tau_vertices: DefaultDict[int, int] = defaultdict(int)
-        self.seen_edges: Set[FrozenSet[int]] = set() if skip_duplicates else None
+        self.rng = np.random.default_rng(seed)
+        # the scaling factor only changes with t: cache it along with its constant denominator
+        self._xi_t: int = -1
+        self._xi_value: float = 1.0
+        self._xi_den: int = M * (M - 1) * (M - 2)
 
     def xi(self) -> float:
+        if self.t != self._xi_t:
+            self._xi_t = self.t
+            self._xi_value = self._scaling_factor()
+        return self._xi_value
+
+    def _scaling_factor(self) -> float:
         if self.t <= self.M:
             return 1.0
         numerator = self.t * (self.t - 1) * (self.t - 2)
-        denominator = self.M * (self.M - 1) * (self.M - 2)
-        return max(1.0, numerator / denominator)
+        return max(1.0, numerator / self._xi_den)
 
-    def _sample_edge(self, edge: FrozenSet[int]) -> bool:
-        if self.t <= self.M:
-            return True
-        if random.random() < (self.M / self.t):
-            edge_to_remove = random.choice(list(self.S))
-            self.S.remove(edge_to_remove)
-            self._update_counters(edge_to_remove, increment=False)
-            return True
-        return False
+    def _add_edge(self, edge: Edge):
+        # a repeated edge (skip_duplicates=False) is only stored once, S being a set
+        if edge in self.S:
+            return
+        self.S.add(edge)
+        self.S_index[edge] = len(self.S_list)
+        self.S_list.append(edge)
+        u, v = edge
+        self.adj[u].add(v)
+        self.adj[v].add(u)
 
-    def _update_counters(self, edge: FrozenSet[int], increment: bool = True):
-        u, v = tuple(edge)
-        N_u = {node for link in self.S if u in link for node in link if node != u}
-        N_v = {node for link in self.S if v in link for node in link if node != v}
-        shared_neighborhood = N_u & N_v
-        
+    def _remove_edge_at(self, i: int) -> Edge:
+        """Remove the edge stored at S_list[i] (swap with the last one and pop)."""
+        edge = self.S_list[i]
+        last = self.S_list.pop()
+        if i < len(self.S_list):
+            self.S_list[i] = last
+            self.S_index[last] = i
+        del self.S_index[edge]
+        self.S.remove(edge)
+        u, v = edge
+        for a, b in ((u, v), (v, u)):
+            self.adj[a].discard(b)
+            if not self.adj[a]:
+                del self.adj[a]
+        return edge
+
+    def _shared_neighborhood(self, u: int, v: int) -> Set[int]:
+        """Vertices adjacent to both u and v in the sample: O(min(deg(u), deg(v)))."""
+        if u not in self.adj or v not in self.adj:
+            return set()
+        return self.adj[u] & self.adj[v]
+
+    def _read_edges(self) -> Tuple[np.ndarray, int]:
+        """
+        Load the whole edge stream as an (E, 2) array of (u, v) with u < v in one C-level parse, dropping
+        self-loops and (if skip_duplicates) repeated edges while keeping stream order.
+        Lines with fewer than two fields are skipped, as the line-by-line reader did.
+        Returns the edges and the number of duplicates skipped.
+        """
+        try:
+            edges = np.loadtxt(self.file, dtype=np.int64, comments='#', usecols=(0, 1), ndmin=2)
+        except ValueError:
+            # a short line breaks the strict parse: drop those lines and parse the rest
+            # (a field that is not an integer still raises)
+            with open(self.file) as f:
+                lines = [line for line in f if len(line.split('#', 1)[0].split()) >= 2]
+            edges = np.loadtxt(lines, dtype=np.int64, usecols=(0, 1), ndmin=2)
+        edges = np.sort(edges[edges[:, 0] != edges[:, 1]], axis=1)
+        if not self.skip_duplicates or len(edges) == 0:
+            return edges, 0
+        # dedup on one packed (u << 32) | v key per edge: a flat int sort instead of a row-wise one
+        _, first = np.unique(edge_keys(edges), return_index=True)
+        return edges[np.sort(first)], len(edges) - len(first)
+
+    def _sampling_plan(self, n_edges: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Reservoir sampling decisions for the whole stream at once: edge t is kept with
+        probability M / t (always while t <= M) and, once the sample is full, replaces
+        the edge at a uniformly random slot of S_list.
+        evict holds uniform draws in [0, 1), scaled by len(S_list) when the edge comes in:
+        with repeated edges in the stream the sample can hold fewer than M edges.
+        """
+        t = np.arange(1, n_edges + 1)
+        accept = (t <= self.M) | (self.rng.random(n_edges) * t < self.M)
+        evict = self.rng.random(n_edges)
+        return accept, evict
+
+    def _increment_counters(self, edge: Edge):
+        u, v = edge
+        shared_neighborhood = self._shared_neighborhood(u, v)
+        n = len(shared_neighborhood)
+        if not n:
+            return
+
+        # u and v gain one triangle per shared neighbour: update them once
+        self.tau += n
+        self.tau_vertices[u] += n
+        self.tau_vertices[v] += n
         for c in shared_neighborhood:
-            if increment:
-                self.tau += 1
-                self.tau_vertices[u] += 1
-                self.tau_vertices[v] += 1
-                self.tau_vertices[c] += 1
-            else:
-                self.tau -= 1
-                self.tau_vertices[u] -= 1
-                self.tau_vertices[v] -= 1
-                self.tau_vertices[c] -= 1
-                if self.tau_vertices[u] == 0:
-                    del self.tau_vertices[u]
-                if self.tau_vertices[v] == 0:
-                    del self.tau_vertices[v]
-                if self.tau_vertices[c] == 0:
-                    del self.tau_vertices[c]
+            self.tau_vertices[c] += 1
+
+    def _decrement_counters(self, edge: Edge):
+        u, v = edge
+        shared_neighborhood = self._shared_neighborhood(u, v)
+        n = len(shared_neighborhood)
+        if not n:
+            return
+
+        self.tau -= n
+        for x in (u, v):
+            self.tau_vertices[x] -= n
+            if self.tau_vertices[x] == 0:
+                del self.tau_vertices[x]
+        for c in shared_neighborhood:
+            self.tau_vertices[c] -= 1
+            if self.tau_vertices[c] == 0:
+                del self.tau_vertices[c]
 
     def run(self) -> float:
         if self.verbose:
@@ -69,38 +309,25 @@ class TriestBase:
             print(f"Reading from file: {self.file}")
             print(f"Skip duplicates: {self.skip_duplicates}\n")
 
-        skipped_count = 0
-        
-        with open(self.file, 'r') as f:
-            for line in f:
-                line = line.strip()
-                if not line or line.startswith('#'):
-                    continue
-                
-                edge = _get_edge(line)
-                if len(edge) != 2:
-                    continue
-                
-                u, v = tuple(edge)
-                if u == v:
-                    continue
-                
-                if self.skip_duplicates:
-                    if edge in self.seen_edges:
-                        skipped_count += 1
-                        continue
-                    self.seen_edges.add(edge)
-                
-                self.t += 1
-
-                if self.verbose and self.t % 10000 == 0:
-                    current_estimate = self.xi() * self.tau
-                    print(f"Processed {self.t} edges | Skipped {skipped_count} | "
-                          f"Sample: {len(self.S)} | Estimate: {current_estimate:.2f}")
-
-                if self._sample_edge(edge):
-                    self.S.add(edge)
-                    self._update_counters(edge, increment=True)
+        edges, skipped_count = self._read_edges()
+        accept, evict = self._sampling_plan(len(edges))
+
+        # only the accepted edges touch the sample, the others are skipped in bulk
+        for start in range(0, len(edges), 10000):
+            for i in (np.flatnonzero(accept[start:start + 10000]) + start).tolist():
+                self.t = i + 1
+                edge = tuple(edges[i].tolist())
+                if self.t > self.M:
+                    edge_to_remove = self._remove_edge_at(int(evict[i] * len(self.S_list)))
+                    self._decrement_counters(edge_to_remove)
+                self._add_edge(edge)
+                self._increment_counters(edge)
+
+            self.t = min(start + 10000, len(edges))
+            if self.verbose and self.t % 10000 == 0:
+                current_estimate = self.xi() * self.tau
+                print(f"Processed {self.t} edges | Skipped {skipped_count} | "
+                      f"Sample: {len(self.S)} | Estimate: {current_estimate:.2f}")
 
         final_estimate = self.xi() * self.tau
         
@@ -116,40 +343,91 @@ class TriestBase:
 
         return final_estimate
 
+    def run_compiled(self) -> float:
+        """
+        Same estimator as run() but the whole stream loop runs in the compiled triest_core module.
+        Only the global count is tracked there, so tau_vertices and the sample stay empty.
+        """
+        if triest_core is None:
+            raise ImportError("triest_core is not built, run `cythonize -i triest_core.pyx` in HW3/")
+        seed = int(self.rng.integers(0, 2**63))
+        self.tau, self.t, skipped_count = triest_core.run_base(self.file, self.M, seed, self.skip_duplicates)
+        final_estimate = self.xi() * self.tau
+
+        if self.verbose:
+            print(f"Total unique edges: {self.t}")
+            print(f"Duplicates skipped: {skipped_count}")
+            print(f"Raw triangles in sample: {self.tau}")
+            print(f"FINAL ESTIMATE: {final_estimate:.2f} triangles")
+
+        return final_estimate
+
+    def _jit_loop(self, edges: np.ndarray, accept: np.ndarray, evict: np.ndarray):
+        return run_base_loop(edges, accept, evict, self.M)
+
+    def _final_estimate(self) -> float:
+        return self.xi() * self.tau
+
+    def run_jit(self) -> float:
+        """
+        Same estimator and sampling decisions as run() but the stream loop is compiled with numba:
+        the sample's neighbourhoods are sorted int64 arrays and shared neighbours come from a merge of two of them.
+        tau_vertices is filled, the sample itself is not kept.
+        """
+        if njit is None:
+            raise ImportError("numba is not installed, use run() instead")
+        edges, skipped_count = self._read_edges()
+        accept, evict = self._sampling_plan(len(edges))
+        tau, vertices, counts = self._jit_loop(edges, accept, evict)
+        self.tau = tau
+        self.tau_vertices = defaultdict(int, zip(vertices.tolist(), counts.tolist()))
+        self.t = len(edges)
+        final_estimate = self._final_estimate()
+
+        if self.verbose:
+            print(f"Total unique edges: {self.t}")
+            print(f"Duplicates skipped: {skipped_count}")
+            print(f"Raw triangles in sample: {self.tau}")
+            print(f"FINAL ESTIMATE: {final_estimate:.2f} triangles")
+
+        return final_estimate
+
     def get_local_estimate(self, vertex: int) -> float:
         return self.xi() * self.tau_vertices.get(vertex, 0)
 
 class TriestImpr(TriestBase):
-    def xi(self) -> float:
-        """Return the weight factor η(t) for TRIÈST-IMPR."""
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._xi_den = self.M * (self.M - 1)
+
+    def _scaling_factor(self) -> float:
+        """Return the weight factor η(t) for TRIÈST-IMPR (xi() caches it per t)."""
         if self.t < 3:  # Less than 3 edges => no triangles possible
             return 1.0
-        return max(1.0, (self.t - 1) * (self.t - 2) / (self.M * (self.M - 1)))
+        return max(1.0, (self.t - 1) * (self.t - 2) / self._xi_den)
+
+    def _jit_loop(self, edges: np.ndarray, accept: np.ndarray, evict: np.ndarray):
+        return run_impr_loop(edges, accept, evict, self.M)
 
-    def _update_counters(self, edge: FrozenSet[int], increment: bool = True):
+    def _final_estimate(self) -> float:
+        return self.tau
+
+    def _increment_counters(self, edge: Edge):
         """Update counters with weight η(t). TRIÈST-IMPR never decrements."""
-        u, v = tuple(edge)
-        N_u = {node for link in self.S if u in link for node in link if node != u}
-        N_v = {node for link in self.S if v in link for node in link if node != v}
-        shared_neighborhood = N_u & N_v
-        weight = self.xi() if increment else 0  # No decrement in TRIÈST-IMPR
+        u, v = edge
+        shared_neighborhood = self._shared_neighborhood(u, v)
+        if not shared_neighborhood:
+            return
+        weight = self.xi()
 
+        # u and v gain one weighted triangle per shared neighbour: update them once
+        w = weight * len(shared_neighborhood)
+        self.tau += w
+        self.tau_vertices[u] += w
+        self.tau_vertices[v] += w
         for c in shared_neighborhood:
-            self.tau += weight
-            self.tau_vertices[u] += weight
-            self.tau_vertices[v] += weight
             self.tau_vertices[c] += weight
 
-    def _sample_edge(self, edge: FrozenSet[int]) -> bool:
-        """Reservoir sampling logic for TRIÈST-IMPR (same as TRIÈST-BASE)."""
-        if self.t <= self.M:
-            return True
-        if random.random() < (self.M / self.t):
-            edge_to_remove = random.choice(list(self.S))
-            self.S.remove(edge_to_remove)
-            return True
-        return False
-
     def run(self) -> float:
         """Process the edge stream using TRIÈST-IMPR."""
         if self.verbose:
@@ -157,41 +435,26 @@ class TriestImpr(TriestBase):
             print(f"Reading from file: {self.file}")
             print(f"Skip duplicates: {self.skip_duplicates}\n")
 
-        skipped_count = 0
-        
-        with open(self.file, 'r') as f:
-            for line in f:
-                line = line.strip()
-                if not line or line.startswith('#'):
-                    continue
-                
-                edge = _get_edge(line)
-                if len(edge) != 2:
-                    continue
-                
-                u, v = tuple(edge)
-                if u == v:
-                    continue
-                
-                if self.skip_duplicates:
-                    if edge in self.seen_edges:
-                        skipped_count += 1
-                        continue
-                    self.seen_edges.add(edge)
-                
-                self.t += 1
-
-                # Update counters unconditionally
-                self._update_counters(edge, increment=True)
-
-                # Sample edge using reservoir logic
-                if self._sample_edge(edge):
-                    self.S.add(edge)
-
-                if self.verbose and self.t % 10000 == 0:
-                    current_estimate = self.tau
-                    print(f"Processed {self.t} edges | Skipped {skipped_count} | "
-                          f"Sample: {len(self.S)} | Estimate: {current_estimate:.2f}")
+        edges, skipped_count = self._read_edges()
+        accept, evict = self._sampling_plan(len(edges))
+
+        for i, (u, v) in enumerate(edges.tolist()):
+            self.t = i + 1
+            edge = (u, v)
+
+            # Update counters unconditionally
+            self._increment_counters(edge)
+
+            # Sample edge using the precomputed reservoir decisions
+            if accept[i]:
+                if self.t > self.M:
+                    self._remove_edge_at(int(evict[i] * len(self.S_list)))
+                self._add_edge(edge)
+
+            if self.verbose and self.t % 10000 == 0:
+                current_estimate = self.tau
+                print(f"Processed {self.t} edges | Skipped {skipped_count} | "
+                      f"Sample: {len(self.S)} | Estimate: {current_estimate:.2f}")
 
         final_estimate = self.tau
 
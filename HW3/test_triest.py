@@ -0,0 +1,52 @@
+import os
+import tempfile
+import unittest
+import warnings
+
+from Triest import TriestBase, TriestImpr
+
+
+class ReadEdgesTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def write_edges(self, text, name="edges.txt"):
+        path = os.path.join(self.tmp.name, name)
+        with open(path, "w") as f:
+            f.write(text)
+        return path
+
+    def test_short_lines_are_skipped(self):
+        clean = self.write_edges("# comment\n1 2\n3 2\n2 3\n4 4\n1 3\n", "clean.txt")
+        messy = self.write_edges("# comment\n1 2\n7\n3 2\n\n2 3\n4 4\n  5  \n1 3\n", "messy.txt")
+
+        edges, skipped = TriestBase(messy, 10, verbose=False)._read_edges()
+        expected, expected_skipped = TriestBase(clean, 10, verbose=False)._read_edges()
+
+        self.assertEqual(edges.tolist(), [[1, 2], [2, 3], [1, 3]])
+        self.assertEqual(edges.tolist(), expected.tolist())
+        self.assertEqual(skipped, expected_skipped)
+
+    def test_only_short_lines(self):
+        path = self.write_edges("1\n2\n")
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")  # numpy warns about an empty input
+            edges, skipped = TriestBase(path, 10, verbose=False)._read_edges()
+        self.assertEqual(edges.shape, (0, 2))
+        self.assertEqual(skipped, 0)
+
+    def test_non_integer_field_raises(self):
+        path = self.write_edges("1 2\n7\n2 x\n")
+        with self.assertRaises(ValueError):
+            TriestBase(path, 10, verbose=False)._read_edges()
+
+    def test_run_with_a_short_line(self):
+        # two triangles, all edges fit in the sample so both estimators are exact
+        path = self.write_edges("1 2\n2 3\n9\n1 3\n3 4\n2 4\n")
+        for cls in (TriestBase, TriestImpr):
+            self.assertAlmostEqual(cls(path, 10, verbose=False, seed=0).run(), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,125 @@
+# distutils: language = c++
+# cython: language_level=3, boundscheck=False, wraparound=False
+"""
+Compiled TRIÈST-BASE stream loop: parsing, reservoir sampling and triangle updates all run in C++,
+Python only sees the final counters (see TriestBase.run_compiled).
+
+Build in place with:  cythonize -i triest_core.pyx
+"""
+from cython.operator cimport dereference as deref
+from libc.stdio cimport FILE, fopen, fclose, fgets, sscanf
+from libc.stdint cimport uint64_t
+from libcpp.vector cimport vector
+from libcpp.pair cimport pair
+from libcpp.unordered_map cimport unordered_map
+from libcpp.unordered_set cimport unordered_set
+
+ctypedef unordered_map[long long, unordered_set[long long]] Adjacency
+ctypedef pair[long long, long long] Edge
+
+
+cdef extern from "<random>" namespace "std" nogil:
+    cdef cppclass mt19937_64:
+        mt19937_64(uint64_t seed)
+        uint64_t operator()()
+
+
+cdef inline double _uniform(mt19937_64& gen) nogil:
+    # 53 random bits -> double in [0, 1)
+    return (gen() >> 11) * (1.0 / 9007199254740992.0)
+
+
+cdef long long _shared(Adjacency& adj, long long u, long long v):
+    """Number of common neighbours of u and v: walk the smaller set, probe the larger one."""
+    cdef Adjacency.iterator iu = adj.find(u)
+    cdef Adjacency.iterator iv = adj.find(v)
+    if iu == adj.end() or iv == adj.end():
+        return 0
+    cdef unordered_set[long long]* small = &deref(iu).second
+    cdef unordered_set[long long]* big = &deref(iv).second
+    if small.size() > big.size():
+        small, big = big, small
+    cdef long long count = 0
+    cdef long long w
+    for w in small[0]:
+        if big.count(w):
+            count += 1
+    return count
+
+
+cdef void _link(Adjacency& adj, long long u, long long v):
+    adj[u].insert(v)
+    adj[v].insert(u)
+
+
+cdef void _unlink(Adjacency& adj, long long u, long long v):
+    adj[u].erase(v)
+    if adj[u].empty():
+        adj.erase(u)
+    adj[v].erase(u)
+    if adj[v].empty():
+        adj.erase(v)
+
+
+def run_base(str path, long long M, uint64_t seed, bint skip_duplicates=True):
+    """
+    Run TRIÈST-BASE over the edge file at `path` with a sample of M edges.
+    Returns (tau, t, skipped): triangles in the sample, unique edges streamed, duplicates skipped.
+    """
+    if M < 1:
+        raise ValueError(f"M must be at least 1, got {M}")
+    cdef FILE* f = fopen(path.encode(), b"r")
+    if f == NULL:
+        raise FileNotFoundError(path)
+
+    cdef char line[256]
+    cdef long long a, b, u, v, t = 0, skipped = 0, tau = 0
+    cdef uint64_t key
+    cdef Py_ssize_t i
+    cdef mt19937_64* gen = new mt19937_64(seed)
+    cdef vector[Edge] sample
+    cdef unordered_set[uint64_t] seen
+    # keys of the edges currently in the sample: a repeated edge is kept once, like S in TriestBase
+    cdef unordered_set[uint64_t] sampled
+    cdef Adjacency adj
+    cdef Edge evicted
+
+    try:
+        while fgets(line, sizeof(line), f) != NULL:
+            if line[0] == b'#' or sscanf(line, "%lld %lld", &a, &b) != 2 or a == b:
+                continue
+            u, v = (a, b) if a < b else (b, a)
+            key = (<uint64_t>u << 32) | <uint64_t>v
+
+            if skip_duplicates:
+                if seen.count(key):
+                    skipped += 1
+                    continue
+                seen.insert(key)
+
+            t += 1
+            if sampled.count(key):
+                # already sampled (only possible without skip_duplicates): no reservoir step, no second slot
+                continue
+            if t > M:
+                if _uniform(gen[0]) * t >= M:
+                    continue
+                # replace a uniformly random slot of the sample (it can hold fewer than M edges
+                # when repeated edges came in while it was filling up)
+                i = <Py_ssize_t>(gen[0]() % <uint64_t>sample.size())
+                evicted = sample[i]
+                sampled.erase((<uint64_t>evicted.first << 32) | <uint64_t>evicted.second)
+                _unlink(adj, evicted.first, evicted.second)
+                tau -= _shared(adj, evicted.first, evicted.second)
+                sample[i] = Edge(u, v)
+            else:
+                sample.push_back(Edge(u, v))
+
+            sampled.insert(key)
+            _link(adj, u, v)
+            tau += _shared(adj, u, v)
+    finally:
+        fclose(f)
+        del gen
+
+    return tau, t, skipped